@@ -1,12 +1,59 @@
+from importlib import import_module as _import_module
+
 import securepy.config.config as _conf
-from securepy.limited_process import LimitedProcess  # noqa
-from securepy.restrictor import Restrictor  # noqa
-from securepy.security import get_safe_globals  # noqa
-from securepy.stdio import IOCage, MemoryOverflow, LimitedStringIO  # noqa
-from securepy.timing import IOTimedFunction, TimedFunction, TimedFunctionError  # noqa
+
+# Public objects are only imported once they're accessed (PEP 562), this
+# avoids importing `subprocess` and `multiprocessing` unless they're needed
+_LAZY_OBJECTS = {
+    "LimitedProcess": "securepy.limited_process",
+    "Restrictor": "securepy.restrictor",
+    "get_safe_globals": "securepy.security",
+    "IOCage": "securepy.stdio",
+    "MemoryOverflow": "securepy.stdio",
+    "LimitedStringIO": "securepy.stdio",
+    "IOTimedFunction": "securepy.timing",
+    "TimedFunction": "securepy.timing",
+    "TimedFunctionError": "securepy.timing",
+}
+
+__all__ = [
+    "LimitedProcess",
+    "Restrictor",
+    "get_safe_globals",
+    "IOCage",
+    "MemoryOverflow",
+    "LimitedStringIO",
+    "IOTimedFunction",
+    "TimedFunction",
+    "TimedFunctionError",
+]
+
+# Only true for type checkers, this avoids importing `typing` just for `TYPE_CHECKING`
+_TYPE_CHECKING = False
+if _TYPE_CHECKING:
+    from securepy.limited_process import LimitedProcess  # noqa
+    from securepy.restrictor import Restrictor  # noqa
+    from securepy.security import get_safe_globals  # noqa
+    from securepy.stdio import IOCage, MemoryOverflow, LimitedStringIO  # noqa
+    from securepy.timing import IOTimedFunction, TimedFunction, TimedFunctionError  # noqa
 
 __title__ = _conf.NAME
 __author__ = _conf.AUTHOR
 __licence__ = _conf.LICENCE
 __copyright__ = _conf.COPYRIGHT
 __version__ = _conf.VERSION
+
+
+def __getattr__(name: str) -> object:
+    try:
+        module = _LAZY_OBJECTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    value = getattr(_import_module(module), name)
+    globals()[name] = value  # Cache it, so that `__getattr__` isn't needed next time
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
@@ -2,11 +2,12 @@
 This file will be run in subprocess and it's where the true code
 execution is happening.
 
-You need to provide system arguments to define,
-the code that will be executed and the restriction level
+You need to provide system arguments to define the restriction level and
+memory limit (bytes), `-1` disables the memory limit.
+The code that will be executed is read from STDIN
 
 Example usage:
-    `python securepy/executor.py [restriction_level] [memory_limit] [code]`
+    `python securepy/executor.py [restriction_level] [memory_limit] < [code]`
 
 This also means that it will assume root of securepy/ hence
 the imports specified here won't need the `import securepy.module`
@@ -16,28 +17,48 @@ but will instead only use `import module`.
 import sys
 import warnings
 
-from security import get_safe_globals  # type: ignore (Pylance can't recognize this import as it's using different workdir)
 
+def apply_limits(max_virtual_memory: int) -> None:
+    """
+    Limit the resources available to this process, `-1` means that the
+    memory won't be limited. Core dumps are always disabled.
 
-def mem_limit(max_virtual_memory: int) -> None:
+    Time isn't limited here, the parent process enforces its time limit
+    itself and reports exceeding it, which a kernel CPU time limit
+    (killing this process with `SIGXCPU`) would get in the way of.
+
+    This is called before anything else gets imported, so that the limits
+    are already in place for the rest of the process startup.
+    """
     if sys.platform in ["linux", "linux32", "darwin"]:
         resource = __import__("resource")
-        resource.setrlimit(resource.RLIMIT_AS, (max_virtual_memory, resource.RLIM_INFINITY))
-    else:
-        warnings.warn("Your operating system doesn't support memory limitation, skipping memory limiting")
+        if max_virtual_memory != -1:
+            resource.setrlimit(resource.RLIMIT_AS, (max_virtual_memory, max_virtual_memory))
+        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    elif max_virtual_memory != -1:
+        warnings.warn("Your operating system doesn't support resource limitation, skipping resource limiting")
 
 
 if __name__ == "__main__":
     try:
         restriction_level = int(sys.argv[1])
         memory_limit = int(sys.argv[2])
-        code = sys.argv[3]
     except IndexError:
         raise RuntimeError("Warning, some arguments are missing.")
     except ValueError:
         raise RuntimeError("Warning, some arguments aren't correct.")
 
-    if memory_limit != -1:
-        mem_limit(memory_limit)
+    apply_limits(memory_limit)
+
+    from security import get_safe_globals  # type: ignore (Pylance can't recognize this import as it's using different workdir)
+
+    # Code is passed through STDIN rather than as an argument, this avoids
+    # the `ARG_MAX` limitation and keeps it out of the process cmdline
+    code = sys.stdin.buffer.read().decode("utf-8")
+
+    # The parent decodes our output as UTF-8, piped streams would otherwise use the
+    # locale encoding (such as the ANSI code page on Windows)
+    sys.stdout.reconfigure(encoding="utf-8")  # type: ignore (STDOUT is always a TextIOWrapper here)
+    sys.stderr.reconfigure(encoding="utf-8", errors="backslashreplace")  # type: ignore (STDERR is always a TextIOWrapper here)
 
     exec(code, get_safe_globals(restriction_level))
@@ -1,45 +1,18 @@
+import os
+import select
+import selectors
 import subprocess
 import sys
-import threading
 import typing as t
 
 from securepy.stdio import MemoryOverflow
 
-
-class ExcThread(threading.Thread):
-    """
-    This is an override for general `threading.Thread` class
-    in order to provide the ability to store exceptions
-    """
-    def run(self) -> None:
-        """
-        Method representing the thread's activity.
-
-        This method runs the provided `_target` function,
-        in case any exception occures in it, it will be stored
-        as `self.exc`
-        """
-        try:
-            if self._target:  # type: ignore (Pylance doesn't recognize this variable)
-                self._target(*self._args, **self._kwargs)  # type: ignore (Pylance doesn't recognize these variables)
-        except BaseException as e:
-            self.exc = e
-        finally:
-            # Avoid a refcycle if the thread is running a function with
-            # an argument that has a member that points to the thread.
-            del self._target, self._args, self._kwargs  # type: ignore (Pylance doesn't recognize these variables)
-
-    def join(self, timeout: t.Optional[float]) -> None:
-        """
-        In case an exception has occured while the thread was running,
-        automatically raise it from this method.
-        """
-        # We shouldn't be getting any return value, but store it in case of overrides
-        ret = super().join(timeout=timeout)
-        if hasattr(self, "exc") and self.exc:
-            raise self.exc
-
-        return ret
+# Same selector as `subprocess` uses, `poll` is cheaper than `epoll`
+# for the two file descriptors we need to watch
+if hasattr(selectors, "PollSelector"):
+    _PopenSelector = selectors.PollSelector
+else:
+    _PopenSelector = selectors.SelectSelector
 
 
 class LimitedProcess(subprocess.Popen):
@@ -58,83 +31,175 @@ class LimitedProcess(subprocess.Popen):
         self.read_chunk_size = read_chunk_size
         self.max_output_size = max_output_size
         self.output_size = 0
+        # Exception raised inside of one of the reader threads (used on Windows)
+        self._reader_exc: t.Optional[BaseException] = None
 
-    def _readerthread(self, fh, buffer):
-        """
-        Read from STDOUT/STDERR inside of a thred
-        by chunks of `read_chunk_size` until EOF is hit
-        or we reach `max_output_size`.
+    def _finish_output(self, buffer: bytearray, fh) -> t.Optional[t.Union[str, bytes]]:
         """
-        while True:
-            out = fh.read(self.read_chunk_size)
-            self.output_size += sys.getsizeof(out)
+        Turn the collected output `buffer` of a pipe into the value returned by `communicate`.
 
-            if not out:  # "" or None
-                break
-
-            if self.max_output_size is not None and self.output_size > self.max_output_size:
+        Pipes which didn't produce any output give `None`. In text mode, newlines are
+        translated and the output is decoded, directly from the buffer, without copying
+        it into intermediate `bytes` first.
+        """
+        if not buffer:
+            return None
+        if self.text_mode:  # type: ignore (Pylance doesn't recognize this variable)
+            return self._translate_newlines(buffer, fh.encoding, fh.errors)  # type: ignore (Pylance doesn't recognize this function)
+        return bytes(buffer)
+
+    # Checking `sys.platform` directly lets type checkers only see the branch for the current platform
+    if sys.platform == "win32":
+        def _readerthread(self, fh, buffer):
+            """
+            Read from STDOUT/STDERR inside of a thred
+            by chunks of `read_chunk_size` until EOF is hit
+            or we reach `max_output_size`.
+
+            This replaces the reader used by `subprocess.Popen._communicate`,
+            which reads the whole output at once. Chunks are read from the
+            underlying binary buffer with `read1`, which returns what's available
+            instead of waiting for the whole chunk, and decoded once at the end.
+
+            Exceptions can't propagate from the thread, they're stored
+            and raised from `_communicate` once the threads finished.
+            """
+            raw = getattr(fh, "buffer", fh)  # Binary buffer of text mode pipes
+            output = bytearray()
+            try:
+                while True:
+                    out = raw.read1(self.read_chunk_size)
+                    if not out:  # b"" (EOF)
+                        break
+
+                    self.output_size += len(out)
+                    if self.max_output_size is not None and self.output_size > self.max_output_size:
+                        # Don't let the process keep running (and producing output) once we're over the limit
+                        self.kill()
+                        raise MemoryOverflow(
+                            used_memory=self.output_size,
+                            max_memory=self.max_output_size
+                        )
+
+                    output += out
+            except BaseException as exc:
+                self._reader_exc = exc
                 fh.close()
-                raise MemoryOverflow(
-                    used_memory=self.output_size,
-                    max_memory=self.max_output_size
-                )
-
-            buffer.append(out)
-        fh.close()
-
-    def _communicate(self, input, endtime, orig_timeout):
-        # Start reader threads feeding into a list hanging off of this
-        # object, unless they've already been started.
-        if self.stdout and not hasattr(self, "_stdout_buff"):
-            self._stdout_buff = []
-            self.stdout_thread = ExcThread(
-                target=self._readerthread,
-                args=(self.stdout, self._stdout_buff)
-            )
-            self.stdout_thread.daemon = True
-            self.stdout_thread.start()
-
-        if self.stderr and not hasattr(self, "_stderr_buff"):
-            self._stderr_buff = []
-            self.stderr_thread = ExcThread(
-                target=self._readerthread,
-                args=(self.stderr, self._stderr_buff)
-            )
-            self.stderr_thread.daemon = True
-            self.stderr_thread.start()
-
-        if self.stdin:
-            self._stdin_write(input)  # type: ignore (Pylance doesn't recognize this variable)
-
-        # Wait for the reader threads, or time out. If we time out, the
-        # threads remain reading and the fds left open in case the user
-        # calls communicate again.
-        if self.stdout is not None:
-            self.stdout_thread.join(self._remaining_time(endtime))  # type: ignore (Pylance doesn't recognize this function)
-            if self.stdout_thread.is_alive():
-                raise subprocess.TimeoutExpired(self.args, orig_timeout)
-        if self.stderr is not None:
-            self.stderr_thread.join(self._remaining_time(endtime))  # type: ignore (Pylance doesn't recognize this function)
-            if self.stderr_thread.is_alive():
-                raise subprocess.TimeoutExpired(self.args, orig_timeout)
-
-        # Collect the output from and close both pipes, now that we know
-        # both have been read successfully.
-        stdout = None
-        stderr = None
-        if self.stdout:
-            if self._stdout_buff != []:
-                stdout = self._stdout_buff
-            self.stdout.close()
-        if self.stderr:
-            if self._stderr_buff != []:
-                stderr = self._stderr_buff
-            self.stderr.close()
-
-        # All data exchanged.  Translate lists into strings.
-        if stdout is not None:
-            stdout = "".join(stdout)
-        if stderr is not None:
-            stderr = "".join(stderr)
-
-        return (stdout, stderr)
+                return
+
+            data = self._finish_output(output, fh)
+            if data is not None:
+                buffer.append(data)
+            fh.close()
+
+        def _communicate(self, input, endtime, orig_timeout):
+            """
+            Run `subprocess.Popen._communicate` with our `_readerthread`,
+            raising any exception which occurred in the reader threads.
+            """
+            stdout, stderr = super()._communicate(input, endtime, orig_timeout)  # type: ignore (Pylance doesn't recognize this function)
+            if self._reader_exc is not None:
+                raise self._reader_exc
+            return (stdout, stderr)
+
+    else:
+        def _communicate(self, input, endtime, orig_timeout):
+            """
+            Read from STDOUT/STDERR using a selector, reading from whichever
+            pipe is ready by chunks of `read_chunk_size` until EOF is hit
+            on both of them or we reach `max_output_size`.
+
+            This mirrors the POSIX implementation of `subprocess.Popen._communicate`,
+            it avoids the need for reader threads and doesn't block one pipe
+            while waiting for the other one.
+            """
+            if self.stdin and not self._communication_started:  # type: ignore (Pylance doesn't recognize this variable)
+                # Flush stdio buffer. This might block, if the user has
+                # been writing to .stdin in an uncontrolled fashion.
+                try:
+                    self.stdin.flush()
+                except BrokenPipeError:
+                    pass  # communicate() must ignore BrokenPipeError.
+                if not input:
+                    try:
+                        self.stdin.close()
+                    except BrokenPipeError:
+                        pass  # communicate() must ignore BrokenPipeError.
+
+            # Only create this mapping if we haven't already.
+            if not self._communication_started:  # type: ignore (Pylance doesn't recognize this variable)
+                self._fileobj2output = {}
+                if self.stdout:
+                    self._fileobj2output[self.stdout] = bytearray()
+                if self.stderr:
+                    self._fileobj2output[self.stderr] = bytearray()
+
+            stdout = self._fileobj2output[self.stdout] if self.stdout else None
+            stderr = self._fileobj2output[self.stderr] if self.stderr else None
+
+            self._save_input(input)  # type: ignore (Pylance doesn't recognize this function)
+
+            if self._input:  # type: ignore (Pylance doesn't recognize this variable)
+                input_view = memoryview(self._input)  # type: ignore (Pylance doesn't recognize this variable)
+
+            with _PopenSelector() as selector:
+                if self.stdin and input:
+                    selector.register(self.stdin, selectors.EVENT_WRITE)
+                if self.stdout and not self.stdout.closed:
+                    selector.register(self.stdout, selectors.EVENT_READ)
+                if self.stderr and not self.stderr.closed:
+                    selector.register(self.stderr, selectors.EVENT_READ)
+
+                while selector.get_map():
+                    timeout = self._remaining_time(endtime)  # type: ignore (Pylance doesn't recognize this function)
+                    if timeout is not None and timeout < 0:
+                        raise subprocess.TimeoutExpired(self.args, orig_timeout)
+
+                    ready = selector.select(timeout)
+                    # `_check_timeout` expects sequences of output chunks
+                    self._check_timeout(  # type: ignore (Pylance doesn't recognize this function)
+                        endtime, orig_timeout,
+                        [stdout] if stdout else None, [stderr] if stderr else None
+                    )
+
+                    for key, _ in ready:
+                        if key.fileobj is self.stdin:
+                            offset = self._input_offset  # type: ignore (Pylance doesn't recognize this variable)
+                            chunk = input_view[offset:offset + select.PIPE_BUF]  # type: ignore (STDIN is only registered when there is input)
+                            try:
+                                self._input_offset += os.write(key.fd, chunk)  # type: ignore (Pylance doesn't recognize this variable)
+                            except BrokenPipeError:
+                                selector.unregister(key.fileobj)
+                                key.fileobj.close()  # type: ignore (fileobj is always an opened pipe here)
+                            else:
+                                if self._input_offset >= len(self._input):  # type: ignore (Pylance doesn't recognize these variables)
+                                    selector.unregister(key.fileobj)
+                                    key.fileobj.close()  # type: ignore (fileobj is always an opened pipe here)
+                        else:
+                            data = os.read(key.fd, self.read_chunk_size)
+                            if not data:  # EOF
+                                selector.unregister(key.fileobj)
+                                key.fileobj.close()  # type: ignore (fileobj is always an opened pipe here)
+                                continue
+
+                            self.output_size += len(data)
+                            if self.max_output_size is not None and self.output_size > self.max_output_size:
+                                # Don't let the process keep running (and producing output) once we're over the limit
+                                self.kill()
+                                key.fileobj.close()  # type: ignore (fileobj is always an opened pipe here)
+                                raise MemoryOverflow(
+                                    used_memory=self.output_size,
+                                    max_memory=self.max_output_size
+                                )
+
+                            self._fileobj2output[key.fileobj] += data
+
+            self.wait(timeout=self._remaining_time(endtime))  # type: ignore (Pylance doesn't recognize this function)
+
+            # All data exchanged.
+            if self.stdout:
+                stdout = self._finish_output(self._fileobj2output[self.stdout], self.stdout)
+            if self.stderr:
+                stderr = self._finish_output(self._fileobj2output[self.stderr], self.stderr)
+
+            return (stdout, stderr)
@@ -1,4 +1,5 @@
 import os
+import shutil
 import subprocess
 import typing as t
 
@@ -12,8 +13,8 @@ class Restrictor:
         restriction_scope: t.Literal[1, 2, 3] = 2,
         time_limit: t.Optional[t.Union[float, int]] = None,  # seconds
         max_process_memory: t.Optional[int] = 20 * 1024 * 1024,  # 10 MB
-        max_output_memory: t.Optional[int] = 10_000,  # 10,000 characters (bytes) maximum
-        output_chunk_read_size: int = 1_000,  # characters (bytes)
+        max_output_memory: t.Optional[int] = 10_000,  # 10,000 bytes maximum
+        output_chunk_read_size: int = 65_536,  # bytes
         python_path: str = "python"  # default to `python` in PATH
     ):
         """
@@ -32,46 +33,58 @@ class Restrictor:
         canuse. Exceeding this will raise `MemoryOverflow`. In case it's `None`, process
         will run without RAM limitation.
 
-        `max_output_memory` is the maximum allowed memory for STDOUT/STDERR of the process.
-        Exceeding this amount will raise `MemoryOverflow`. In case it's `None`, process
-        will run without STDOUT/STDERR memory limitation.
+        `max_output_memory` is the maximum allowed amount of bytes for STDOUT/STDERR
+        of the process (combined). Exceeding this amount will raise `MemoryOverflow`. In case
+        it's `None`, process will run without STDOUT/STDERR memory limitation.
 
-        `std_chunk_read_size` is the size (amount of characters) in bytes which will be used
-        to read the single output chunk from given process, which will then be added to rest of
+        `output_chunk_read_size` is the maximum size in bytes which will be used to read
+        the single output chunk from given process, which will then be added to rest of
         the STDOUT/STDERR.
 
         `python_path` is the path to python interpreter file which will be called to run the
-        specified code.
+        specified code. It's resolved against PATH once here, so that every execution can
+        directly run the absolute path instead of searching for it.
         """
         self.time_limit = time_limit
         self.restriction_scope = restriction_scope
         self.max_process_memory = max_process_memory if max_process_memory is not None else -1
         self.max_output_memory = max_output_memory
         self.output_chunk_read_size = output_chunk_read_size
-        self.python_path = python_path
+        self.python_path = shutil.which(python_path) or python_path
         self.executable_path = os.path.dirname(os.path.realpath(__file__)) + "/executor.py"
 
     def execute(self, code: str) -> subprocess.CompletedProcess:
+        # Executed code is passed through STDIN, so the arguments only hold the limits
         args = [
             self.python_path, self.executable_path,
-            str(self.restriction_scope), str(self.max_process_memory), code
+            str(self.restriction_scope), str(self.max_process_memory)
         ]
 
+        # Don't pass `preexec_fn` here (the executor applies its limits itself), since
+        # python 3.10, `subprocess` can start the process with `vfork` on Linux (which
+        # doesn't need to copy our page tables), but not when `preexec_fn` is used.
+        # Older versions always use `fork`. `posix_spawn` isn't used here, before 3.13 it
+        # requires `close_fds=False`, which would leak our descriptors to the executed code.
         process = LimitedProcess(
             args=args,  # type: ignore (Pylance can't resolve args properly)
             max_output_size=self.max_output_memory,
             read_chunk_size=self.output_chunk_read_size,
+            stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True
+            # Output is read as bytes and only decoded once it was all read,
+            # don't fail on undecodable output produced by the executed code
+            encoding="utf-8",
+            errors="replace"
         )
 
-        try:
-            # out = read_process_output(process, self.output_chunk_read_size, self.max_output_memory, self.time_limit)
-            stdout, stderr = process.communicate(timeout=self.time_limit)
-        except MemoryOverflow as e:
-            return subprocess.CompletedProcess(args, returncode=-1, stdout=None, stderr=str(e))
-        except subprocess.TimeoutExpired as e:
-            return subprocess.CompletedProcess(args, returncode=-1, stdout=None, stderr=str(e))
+        # Exiting the context closes the pipes and reaps the process
+        with process:
+            try:
+                stdout, stderr = process.communicate(input=code, timeout=self.time_limit)
+            except (MemoryOverflow, subprocess.TimeoutExpired) as e:
+                # Make sure the process doesn't keep running in the background
+                process.kill()
+                return subprocess.CompletedProcess(args, returncode=-1, stdout=None, stderr=str(e))
 
         return subprocess.CompletedProcess(args, returncode=1, stdout=stdout, stderr=stderr)
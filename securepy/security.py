@@ -1,6 +1,13 @@
+from __future__ import annotations
+
 import builtins
-import typing as t
-from copy import deepcopy
+
+# This module is imported by every executor process, `typing` is only
+# needed for annotations and importing it makes up a considerable part
+# of the executor's startup time, so only import it for type checkers
+_TYPE_CHECKING = False
+if _TYPE_CHECKING:
+    import typing as t
 
 
 class ProtectionBreach(RuntimeError):
@@ -51,9 +58,9 @@ SAFE_DUNDERS = [
     "__build_class__", "__name__"
 ]
 
-SAFE_BUILTINS = SAFE_TYPES + SAFE_FUNCTIONS + SAFE_EXCEPTIONS + SAFE_DUNDERS
+SAFE_BUILTINS = frozenset(SAFE_TYPES + SAFE_FUNCTIONS + SAFE_EXCEPTIONS + SAFE_DUNDERS)
 
-UNSAFE_BUILTINS = [
+UNSAFE_BUILTINS = frozenset((
     "dir",  # General purpose introspector
     "compile",  # don't allow producing new code
     # Unsafe access to namespace
@@ -66,7 +73,7 @@ UNSAFE_BUILTINS = [
     "input",
     "open",
     "file",
-]
+))
 
 
 def secure_getattr(object: t.Any, name: str, default=None) -> t.Any:
@@ -84,59 +91,22 @@ OVERRIDDEN_VALUES = {
 BASE_GLOBALS = {"__builtins__": {}}
 UNRESTRICTED_GLOBALS = {"__builtins__": builtins}
 
-SAFE_GLOBALS = deepcopy(BASE_GLOBALS)
-for name in SAFE_BUILTINS:
-    SAFE_GLOBALS["__builtins__"][name] = getattr(builtins, name)
-for name, reference in OVERRIDDEN_VALUES.items():
-    SAFE_GLOBALS["__builtins__"][name] = reference
+_builtins_dict = vars(builtins)
 
-RESTRICTED_GLOBALS = deepcopy(BASE_GLOBALS)
-for builtin, reference in vars(builtins).items():
-    if builtin not in UNSAFE_BUILTINS:
-        RESTRICTED_GLOBALS["__builtins__"][builtin] = reference
-
-
-def _mutable_copy(x: t.Any) -> t.Any:
-    if isinstance(x, (dict, list, set, tuple)):
-        return full_copy(x)
-    return x
+SAFE_GLOBALS = {"__builtins__": {name: _builtins_dict[name] for name in SAFE_BUILTINS}}
+SAFE_GLOBALS["__builtins__"].update(OVERRIDDEN_VALUES)
 
+RESTRICTED_GLOBALS = {
+    "__builtins__": {name: reference for name, reference in _builtins_dict.items() if name not in UNSAFE_BUILTINS}
+}
 
-def full_copy(x: t.Any) -> t.Any:
-    """
-    Replicate `deepcopy` behavior, but in case `TypeError`
-    is raised (usually due to pickling error for module),
-    go through the mutable datatypes pairs manually.
-    """
-    try:
-        return deepcopy(x)
-    except TypeError as e:
-        if isinstance(x, dict):
-            new_dct = {}
-            for key, value in x.items():
-                value = _mutable_copy(value)
-                new_dct[key] = value
-            return new_dct
-        elif isinstance(x, list):
-            new_lst = []
-            for element in x:
-                element = _mutable_copy(element)
-                new_lst.append(element)
-                return new_lst
-        elif isinstance(x, set):
-            new_set = set()
-            for element in x:
-                element = _mutable_copy(element)
-                new_set.add(element)
-            return new_set
-        elif isinstance(x, tuple):
-            new_tuple = tuple()
-            for element in x:
-                element = _mutable_copy(element)
-                new_tuple += (element, )
-            return new_tuple
-        else:
-            raise e
+# Global scopes are only built once, `get_safe_globals` only hands out copies of these
+GLOBALS_BY_LEVEL = {
+    0: UNRESTRICTED_GLOBALS,
+    1: RESTRICTED_GLOBALS,
+    2: SAFE_GLOBALS,
+    3: BASE_GLOBALS,
+}
 
 
 def get_safe_globals(restriction_level: int) -> dict:
@@ -147,13 +117,14 @@ def get_safe_globals(restriction_level: int) -> dict:
     - 2 (RECOMMENDED): Secure globals (only using relatively safe builtins)
     - 3: No globals (very limiting but quite safe)
     """
-    if restriction_level == 0:
-        return full_copy(UNRESTRICTED_GLOBALS)
-    elif restriction_level == 1:
-        return full_copy(RESTRICTED_GLOBALS)
-    elif restriction_level == 2:
-        return full_copy(SAFE_GLOBALS)
-    elif restriction_level == 3:
-        return full_copy(BASE_GLOBALS)
-    else:
-        raise RuntimeError(f"Invalid `restriction_level` ({restriction_level}), valid values: 0-3.")
+    try:
+        base_globals = GLOBALS_BY_LEVEL[restriction_level]
+    except KeyError:
+        raise RuntimeError(f"Invalid `restriction_level` ({restriction_level}), valid values: 0-3.") from None
+
+    # Builtin objects are never modified in place, copying the containers is
+    # enough to stop the executed code from changing the prebuilt scopes
+    safe_globals = dict(base_globals)
+    if isinstance(safe_globals["__builtins__"], dict):
+        safe_globals["__builtins__"] = dict(safe_globals["__builtins__"])
+    return safe_globals
@@ -14,8 +14,8 @@ class MemoryOverflow(Exception):
     ) -> None:
         if not message:
             message = "Maximum STDOUT/STDERR memory surpassed"
-        if used_memory is not None and max_memory is not None:
-            message += f"({used_memory} > {max_memory})"
+            if used_memory is not None and max_memory is not None:
+                message += f"({used_memory} > {max_memory})"
 
         self.used_memory = used_memory
         self.max_memory = max_memory
@@ -25,19 +25,73 @@ class MemoryOverflow(Exception):
 
 
 class LimitedStringIO(StringIO):
-    """Override `io.StringIO` and apply a maximum memory limitation"""
-    def __init__(self, max_memory: int, initial_value: t.Optional[str] = None, newline: t.Optional[str] = None) -> None:
+    """
+    Override `io.StringIO` and apply a maximum memory limitation
+
+    `newline` defaults to the same value as in `io.StringIO`, which stores written
+    strings as they are, using `None` would make every write go through universal
+    newlines translation, which is considerably slower.
+    """
+    def __init__(self, max_memory: int, initial_value: t.Optional[str] = None, newline: t.Optional[str] = "\n") -> None:
         super().__init__(initial_value=initial_value, newline=newline)
         self.max_memory = max_memory
+        # Keep a running count of written characters, so that we don't
+        # need to materialize the whole buffer with `getvalue` on each write
+        self._used = len(initial_value) if initial_value else 0
+        # Result of the last `getvalue` call, reset once the buffer changes
+        self._value: t.Optional[str] = None
 
     def write(self, __s: str) -> int:
         """Override write method to apply memory limitation."""
-        used_memory = sys.getsizeof(__s) + sys.getsizeof(self.getvalue())
-        if used_memory <= self.max_memory:
-            return super().write(__s)
-        else:
+        # Overwriting already written characters (after `seek`) doesn't take any more memory
+        used_memory = max(self._used, self.tell() + len(__s))
+        if used_memory > self.max_memory:
             raise MemoryOverflow(used_memory=used_memory, max_memory=self.max_memory)
 
+        self._value = None
+        # This is called for every print, calling the method on `StringIO`
+        # directly avoids creating the `super()` proxy object each time
+        written = StringIO.write(self, __s)
+        self._used = used_memory
+        return written
+
+    def writelines(self, __lines: t.Iterable[str]) -> None:
+        """
+        Override writelines method to apply memory limitation once for all
+        of the given lines, either all of them get written, or none of them.
+        """
+        self.write("".join(__lines))
+
+    def truncate(self, __size: t.Optional[int] = None) -> int:
+        """
+        Override truncate method to invalidate cached value and
+        give back the memory taken by the truncated characters.
+        """
+        self._value = None
+        size = super().truncate(__size)
+        self._used = min(self._used, size)
+        return size
+
+    def reset(self) -> None:
+        """Clear the whole buffer, giving back all of the used memory."""
+        self.seek(0)
+        self.truncate(0)
+
+    def getvalue(self) -> str:
+        """
+        Override getvalue method to cache the obtained value,
+        repeated calls without any writes in between won't
+        need to build the whole string again.
+        """
+        if self._value is None:
+            self._value = super().getvalue()
+        return self._value
+
+    def __getstate__(self) -> tuple:
+        """Don't include the cached value when pickling, it would double the payload."""
+        initial_value, newline, position, state = super().__getstate__()  # type: ignore (Pylance doesn't recognize this function)
+        return (initial_value, newline, position, {**state, "_value": None})
+
     def __repr__(self) -> str:
         return f"<LimitedStringIO max_memory={self.max_memory}, value={self.getvalue()}>"
 
@@ -79,7 +133,7 @@ class IOCage:
 
     If you don't want to lose STDOUT/STDERR captured values after function is done running,
     you can specify `auto_reset=False` on init and run `IOCage.reset` manually when needed.
-    You can also specify `memory_limit=100_000` in bytes (100kB) which will limit saved
+    You can also specify `memory_limit=100_000` in characters which will limit saved
     std storage size to that amount.
     """
 
@@ -101,9 +155,9 @@ class IOCage:
         self.stderr_funnel = LimitedStringIO(self.memory_limit)
         self.stdin_funnel = StringIO(stdin) if stdin else None
 
-        self.old_stdout = sys.stdout
-        self.old_stderr = sys.stderr
-        self.old_stdin = sys.stdin
+        # Original (STDOUT, STDERR, STDIN), pushed each time they get overridden,
+        # this is a stack so that entering the same cage again (recursion) restores properly
+        self._saved_std: t.List[t.Tuple[t.TextIO, t.TextIO, t.TextIO]] = []
 
     @property
     def stdout(self) -> str:
@@ -181,19 +235,28 @@ class IOCage:
         if self.auto_reset:
             self.reset()
 
-        with self:
+        # Same as `with self`, without resetting the funnels for the second time
+        self.override_std()
+        try:
             return func(*args, **kwargs)
+        finally:
+            self.restore_std()
 
     def override_std(self) -> None:
         """
         Override `sys.stdout`, `sys.stdin` and `sys.stderr` to use
         `StringIO` instead to capture standard output & error.
+
+        The current streams are stored, so that `restore_std` can put
+        them back, this means nested captures are restored in LIFO order.
         """
-        if not isinstance(sys.stdout, StringIO) and self.enable_stdout:
+        self._saved_std.append((sys.stdout, sys.stderr, sys.stdin))
+
+        if self.enable_stdout:
             sys.stdout = self.stdout_funnel
-        if not isinstance(sys.stderr, StringIO) and self.enable_stderr:
+        if self.enable_stderr:
             sys.stderr = self.stderr_funnel
-        if not isinstance(sys.stdin, StringIO) and self.stdin_funnel is not None:
+        if self.stdin_funnel is not None:
             sys.stdin = self.stdin_funnel
 
     def restore_std(self) -> None:
@@ -201,17 +264,25 @@ class IOCage:
         Revert override of `sys.stdout` and `sys.stderr`
         to restore normal printing capabilities without capturing.
         """
-        if isinstance(sys.stdout, LimitedStringIO):
-            sys.stdout = self.old_stdout
-        if isinstance(sys.stderr, LimitedStringIO):
-            sys.stderr = self.old_stderr
-        if isinstance(sys.stdin, StringIO):
-            sys.stdin = self.old_stdin
+        if not self._saved_std:
+            return
+
+        old_stdout, old_stderr, old_stdin = self._saved_std.pop()
+
+        if self.enable_stdout:
+            sys.stdout = old_stdout
+        if self.enable_stderr:
+            sys.stderr = old_stderr
+        if self.stdin_funnel is not None:
+            sys.stdin = old_stdin
 
     def reset(self) -> None:
         """Reset stored captured stdout & stderr strings."""
-        self.stdout_funnel = LimitedStringIO(self.memory_limit)
-        self.stderr_funnel = LimitedStringIO(self.memory_limit)
+        # Empty the current funnels instead of making new ones, this also keeps
+        # `sys.stdout`/`sys.stderr` valid in case this is called during a capture
+        for funnel in (self.stdout_funnel, self.stderr_funnel):
+            funnel.reset()
+            funnel.max_memory = self.memory_limit
 
     def __repr__(self) -> str:
         return f"<IOCage(stdout={self.stdout}, stderr={self.stderr})"
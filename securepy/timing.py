@@ -1,5 +1,7 @@
 import multiprocessing
+import multiprocessing.connection
 import multiprocessing.pool
+import time
 import typing as t
 import warnings
 from functools import wraps
@@ -34,9 +36,10 @@ class TimedFunction:
 
     Functionality:
     This is achieved by running the given function in a separate process,
-    using `multiprocessing` and waiting for the process to finish with `join`,
-    which will either get called once the time limit expires, or once the given
-    function ends.
+    using `multiprocessing` and waiting for its result to arrive through the pipe,
+    the process is killed if the result doesn't arrive before the time limit expires.
+    If `time_limit` is `None`, there's nothing to enforce and the function is ran
+    directly in the current process instead.
 
     NOTICE: Since the given function is executed from a separate process, certain
     context managers or other things might not work properly, you should consider
@@ -46,7 +49,7 @@ class TimedFunction:
     you'll need to subclass and override `_capture_return` method and `_value_return`.
     """
 
-    def __init__(self, time_limit: t.Union[float, int]):
+    def __init__(self, time_limit: t.Optional[t.Union[float, int]]):
         self.time_limit = time_limit
 
     def _capture_wrapper(self, func: t.Callable) -> t.Callable:
@@ -55,15 +58,16 @@ class TimedFunction:
         in case an exception happens during it's execution,
         capture it too, after that, send the captured values
         via multiprocessing pipe to the main (parent) process.
+        The sending end of this pipe is passed as the first argument.
 
         This is only the bare decorator, the actual functionality
         is defined in `_capture_return` from which the function
         will be ran.
         """
         @wraps(func)
-        def inner(*args, **kwargs) -> None:
+        def inner(connection: multiprocessing.connection.Connection, /, *args, **kwargs) -> None:
             send_value = self._capture_return(func, *args, **kwargs)
-            self.parent.send(send_value)
+            connection.send(send_value)
         return inner
 
     def _capture_return(self, func: t.Callable, *args, **kwargs) -> t.Tuple[t.Literal["exc", "ret"], t.Any]:
@@ -128,9 +132,12 @@ class TimedFunction:
         as a decorator which will run `TimedFunction.run_timed`
         from where the actual functionality is executed.
         """
+        # The function is fixed now, so it only needs to be wrapped once
+        capturing = self._capture_wrapper(func)
+
         @wraps(func)
         def inner(*args, **kwargs) -> None:
-            return self.run_timed(func, args, kwargs)
+            return self._run_capturing(func, capturing, args, kwargs)
         return inner
 
     def run_timed(self, func: t.Callable, args=None, kwargs=None) -> t.Any:
@@ -155,29 +162,70 @@ class TimedFunction:
 
         Functionality:
         This is achieved by running the given function in a separate process,
-        using `multiprocessing` and waiting for the process to finish with `join`,
-        which will either get called once the time limit expires, or once the given
-        function ends.
+        using `multiprocessing` and waiting for its result to arrive through the pipe,
+        the process is killed if the result doesn't arrive before the time limit expires.
         """
         if args is None:
             args = tuple()
         if kwargs is None:
             kwargs = dict()
 
-        capturing = self._capture_wrapper(func)
-        self.child, self.parent = multiprocessing.Pipe()
-        proc = multiprocessing.Process(target=capturing, args=args, kwargs=kwargs)
-        proc.start()
-        # Wait for `self.time_limit` and join
-        # The joining will happen sooner, in case the process ends before the time limit
-        proc.join(self.time_limit)
-
-        if proc.is_alive():
-            proc.kill()
-            proc.join()
-            raise TimeoutError(f"Function `{func.__name__}` took longer than the allowed time limit ({self.time_limit})")
-
-        ret_info = self.child.recv()
+        return self._run_capturing(func, self._capture_wrapper(func), args, kwargs)
+
+    def _run_capturing(self, func: t.Callable, capturing: t.Callable, args: tuple, kwargs: dict) -> t.Any:
+        """
+        Run `capturing`, which is `func` already wrapped with `_capture_wrapper`,
+        this is the actual implementation of `run_timed`, separated so that
+        decorated functions don't need to be wrapped again on every call.
+        """
+        # Without a time limit, there's no point in starting a process which could be killed
+        if self.time_limit is None:
+            ret_info = self._capture_return(func, *args, **kwargs)
+            # The function ran in our own process, interrupting or exiting it
+            # should do so, rather than being reported as an error of the function
+            if ret_info[0] == "exc" and isinstance(ret_info[1], (KeyboardInterrupt, SystemExit)):
+                raise ret_info[1]
+            return self._value_return(ret_info, func)
+
+        # The pipe is only ever used in one direction, which allows using a plain
+        # OS pipe rather than a socket pair, it's also kept local to this call so
+        # that concurrent calls on the same instance can't overwrite each other's pipe
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        proc = multiprocessing.Process(target=capturing, args=(sender, *args), kwargs=kwargs)
+        try:
+            proc.start()
+            # Our copy of the sending end isn't needed, closing it means that
+            # the receiving end gets EOF if the process dies without sending anything
+            sender.close()
+
+            # Wait for the result rather than for the process to end, result which doesn't fit
+            # into the pipe buffer wouldn't let the process end until it was received
+            deadline = time.monotonic() + self.time_limit
+            if not receiver.poll(self.time_limit):
+                raise TimeoutError(f"Function `{func.__name__}` took longer than the allowed time limit ({self.time_limit})")
+
+            try:
+                ret_info = receiver.recv()
+            except EOFError as exc:
+                proc.join()
+                raise TimedFunctionError(
+                    f"Process of timed function `{func.__name__}` ended without sending back its result "
+                    f"(exit code {proc.exitcode}).",
+                    inner_exception=exc
+                ) from None
+
+            # Result is already here, the process only gets the rest of the time limit to end
+            proc.join(max(deadline - time.monotonic(), 0))
+        finally:
+            # This runs on every path (including errors while starting the process or
+            # `KeyboardInterrupt`), so that neither the process nor the pipe outlive this call
+            sender.close()
+            receiver.close()
+            if proc.is_alive():
+                proc.kill()
+                proc.join()
+            proc.close()
+
         return self._value_return(ret_info, func)
 
 
@@ -187,7 +235,7 @@ class IOTimedFunction(TimedFunction):
     capture STDOUT/STDERR of given function using `securepy.stdio.IOCage`.
     """
 
-    def __init__(self, time_limit: int, io_cage: IOCage):
+    def __init__(self, time_limit: t.Optional[t.Union[float, int]], io_cage: IOCage):
         super().__init__(time_limit)
         self.io_cage = io_cage
         warnings.warn("This class is deprecated, it might cause issues with multiprocessing.")
@@ -216,8 +264,11 @@ class IOTimedFunction(TimedFunction):
         additionally decorate the function using `std_capture`
         in order to capture STDOUT/STDERR of that given function.
         """
+        # Only wrap the function once, rather than on every call
+        std_capturing_func = self.io_cage(func)
+        capturing = self._capture_wrapper(std_capturing_func)
+
         @wraps(func)
         def inner(*args, **kwargs) -> None:
-            std_capturing_func = self.io_cage(func)
-            return self.run_timed(std_capturing_func, args, kwargs)
+            return self._run_capturing(std_capturing_func, capturing, args, kwargs)
         return inner
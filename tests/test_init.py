@@ -0,0 +1,20 @@
+import unittest
+
+import securepy
+
+
+class LazyImportTests(unittest.TestCase):
+    """Tests for the lazily imported public objects of the package."""
+
+    def test_all_objects_importable(self):
+        """Make sure every object in `__all__` can be imported, and that no lazy object is missing from it."""
+        self.assertEqual(sorted(securepy.__all__), sorted(securepy._LAZY_OBJECTS))
+        for name in securepy.__all__:
+            with self.subTest(name=name):
+                self.assertIsNotNone(getattr(securepy, name))
+
+    def test_dir(self):
+        """Make sure `dir` lists every public object exactly once, whether it was already imported or not."""
+        names = dir(securepy)
+        self.assertEqual(len(names), len(set(names)))
+        self.assertTrue(set(securepy.__all__) <= set(names))
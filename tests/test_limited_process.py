@@ -0,0 +1,68 @@
+import subprocess
+import sys
+import unittest
+
+from securepy.limited_process import LimitedProcess
+from securepy.stdio import MemoryOverflow
+
+
+def run_python(code: str, max_output_size=None, input=None, **kwargs):
+    """Run given `code` in a `LimitedProcess` of this python interpreter and return its `communicate` result."""
+    process = LimitedProcess(
+        [sys.executable, "-c", code],
+        max_output_size=max_output_size,
+        read_chunk_size=1024,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        **kwargs
+    )
+    with process:
+        try:
+            return process.communicate(input=input, timeout=10)
+        finally:
+            # Make sure the process is stopped, before exiting the context waits for it
+            process.kill()
+
+
+class LimitedProcessTests(unittest.TestCase):
+    """Tests for reading the limited output of a subprocess."""
+
+    def test_stdin_feed(self):
+        """Make sure the whole input is passed to the process, even when it's larger than a pipe buffer."""
+        test_cases = (
+            "hello",
+            "x" * 1_000_000,
+        )
+
+        for input in test_cases:
+            with self.subTest(input=input[:10]):
+                stdout, _ = run_python("import sys; print(len(sys.stdin.read()))", input=input, text=True)
+                self.assertEqual(stdout, f"{len(input)}\n")
+
+    def test_output_limit(self):
+        """Make sure output exceeding the limit raises `MemoryOverflow`, while output within it doesn't."""
+        stdout, _ = run_python("print('x' * 99)", max_output_size=100, text=True)
+        self.assertEqual(stdout, "x" * 99 + "\n")
+
+        with self.assertRaises(MemoryOverflow):
+            run_python("print('x' * 100_000)", max_output_size=100, text=True)
+
+    def test_limit_is_shared_between_pipes(self):
+        """Make sure the output limit counts both STDOUT and STDERR together."""
+        with self.assertRaises(MemoryOverflow):
+            run_python("import sys; print('x' * 60); print('x' * 60, file=sys.stderr)", max_output_size=100, text=True)
+
+    def test_missing_output(self):
+        """Make sure pipes without any output give `None`, in both text and binary mode."""
+        test_cases = (
+            ("print('out')", ("out\n", None), True),
+            ("import sys; print('err', file=sys.stderr)", (None, "err\n"), True),
+            ("pass", (None, None), True),
+            ("print('out')", (b"out\n", None), False),
+            ("pass", (None, None), False),
+        )
+
+        for code, expected, text in test_cases:
+            with self.subTest(code=code, text=text):
+                self.assertEqual(run_python(code, text=text), expected)
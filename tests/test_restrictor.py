@@ -0,0 +1,107 @@
+import subprocess
+import unittest
+
+from securepy import IOCage, Restrictor
+
+
+class RestrictorTests(unittest.TestCase):
+    """Tests for the restricted code execution in a subprocess."""
+
+    # region: Compilation tests
+    def test_syntax_error(self):
+        """Make sure code which can't be compiled reports the compilation error from the executor."""
+        restrictor = Restrictor(time_limit=5)
+        result = restrictor.execute("def (")
+
+        self.assertIsInstance(result, subprocess.CompletedProcess)
+        self.assertIn("SyntaxError", result.stderr)
+
+    def test_too_complex_code(self):
+        """Make sure code too complex to compile only fails in the executor, without affecting the host process."""
+        test_cases = (
+            "-" * 100_000 + "1",  # long chain of unary operators
+            "1+" * 200_000 + "1",  # deeply nested binary operators (crashes the 3.8/3.9 parser)
+        )
+
+        restrictor = Restrictor(time_limit=5)
+        for code in test_cases:
+            with self.subTest(code=code[:10]):
+                result = restrictor.execute(code)
+                self.assertIsInstance(result, subprocess.CompletedProcess)
+
+    def test_compile_warnings(self):
+        """Make sure warnings from compiling the code don't get shown in the host process."""
+        restrictor = Restrictor(time_limit=5)
+        captured = IOCage()
+
+        with captured:
+            result = restrictor.execute("x = 1\nx is 1")
+
+        self.assertEqual(captured.stderr, "")
+        self.assertIn("SyntaxWarning", result.stderr)
+
+    # endregion
+
+    # region: Executor arguments tests
+    def test_independent_args(self):
+        """Make sure changing arguments of one result doesn't affect the other executions."""
+        restrictor = Restrictor(time_limit=5)
+        result = restrictor.execute("print('hi')")
+        result.args.append("changed")
+
+        self.assertNotIn("changed", restrictor.execute("print('hi')").args)
+
+    def test_changed_limits(self):
+        """Make sure changes to the limits after initialization are used by the next execution."""
+        restrictor = Restrictor(time_limit=5)
+        restrictor.restriction_scope = 3
+        result = restrictor.execute("print('hi')")
+
+        self.assertEqual(result.args[2], "3")
+
+    # endregion
+
+    # region: Execution tests
+    def test_large_code(self):
+        """Make sure code larger than a pipe buffer is passed to the executor whole."""
+        restrictor = Restrictor(time_limit=5)
+        code = "print(len('" + "x" * 100_000 + "'))"
+        result = restrictor.execute(code)
+
+        self.assertEqual(result.returncode, 1)
+        self.assertEqual(result.stdout, "100000\n")
+
+    def test_output_limit(self):
+        """Make sure exceeding the output limit stops the execution."""
+        restrictor = Restrictor(time_limit=5, max_output_memory=100)
+        result = restrictor.execute("print('x' * 100_000)")
+
+        self.assertEqual(result.returncode, -1)
+        self.assertIsNone(result.stdout)
+        self.assertIsInstance(result.stderr, str)
+
+    def test_time_limit(self):
+        """Make sure code running for longer than the time limit is stopped and reported as timed out."""
+        restrictor = Restrictor(time_limit=1)
+        result = restrictor.execute("while True: pass")
+
+        self.assertEqual(result.returncode, -1)
+        self.assertIn("timed out", result.stderr)
+
+    def test_non_ascii_output(self):
+        """Make sure non-ASCII output is passed back unchanged, regardless of the locale encoding."""
+        restrictor = Restrictor(time_limit=5)
+        result = restrictor.execute("print('ž€')\nraise ValueError('ž€')")
+
+        self.assertEqual(result.stdout, "ž€\n")
+        self.assertIn("ValueError: ž€", result.stderr)
+
+    def test_missing_output(self):
+        """Make sure streams without any output give `None`."""
+        restrictor = Restrictor(time_limit=5)
+        result = restrictor.execute("print('hi')")
+
+        self.assertEqual(result.stdout, "hi\n")
+        self.assertIsNone(result.stderr)
+
+    # endregion
@@ -11,13 +11,14 @@ class LimitedStringIOTests(unittest.TestCase):
     def test_valid_limits(self):
         """Make sure writing within given limits works properly."""
         test_cases = (
-            (LimitedStringIO(1_000_000), ("test")),  # Under specified limit
-            (LimitedStringIO(1_000_000), ("test", "hi", "hello")),  # Multiple writes under limit
-            (LimitedStringIO(103), ("hello")),  # Exactly at the limit
+            (1_000_000, ("test",)),  # Under specified limit
+            (1_000_000, ("test", "hi", "hello")),  # Multiple writes under limit
+            (5, ("hello",)),  # Exactly at the limit
         )
 
-        for limitedStringIO, test_strings in test_cases:
-            with self.subTest(memory_size=limitedStringIO.max_memory, test_strings=test_strings):
+        for memory_size, test_strings in test_cases:
+            with self.subTest(memory_size=memory_size, test_strings=test_strings):
+                limitedStringIO = LimitedStringIO(memory_size)
                 for test_string in test_strings:
                     limitedStringIO.write(test_string)
                 self.assertEqual(limitedStringIO.getvalue(), "".join(test_strings))
@@ -25,25 +26,86 @@ class LimitedStringIOTests(unittest.TestCase):
     def test_invalid_limits(self):
         """Make sure writing strings over allowed size won't work."""
         test_cases = (
-            (LimitedStringIO(1), ("test",), 102),  # 101 above the limit
-            (LimitedStringIO(102), ("hello"), 103),  # 1 above the limit
-            (LimitedStringIO(120), ("hello", "hey there", "hi", "itsdrike"), 122)  # Multiple writes, fail on last
+            (1, ("test",), 4),  # 3 above the limit
+            (4, ("hello",), 5),  # 1 above the limit
+            (20, ("hello", "hey there", "hi", "itsdrike"), 24)  # Multiple writes, fail on last
         )
 
-        for limitedStringIO, test_strings, test_memory in test_cases:
-            with self.subTest(max_memory_size=limitedStringIO.max_memory, given_memory_size=test_memory, test_strings=test_strings):
-                try:
+        for max_memory_size, test_strings, test_memory in test_cases:
+            with self.subTest(max_memory_size=max_memory_size, given_memory_size=test_memory, test_strings=test_strings):
+                limitedStringIO = LimitedStringIO(max_memory_size)
+                with self.assertRaises(MemoryOverflow) as cm:
                     for test_string in test_strings:
                         limitedStringIO.write(test_string)
-                except Exception as e:
-                    self.assertIsInstance(e, MemoryOverflow)
-                    if isinstance(e, MemoryOverflow):
-                        self.assertEqual(e.used_memory, test_memory)
+                self.assertEqual(cm.exception.used_memory, test_memory)
+
+    def test_writelines(self):
+        """Make sure writelines applies the limit to all of the given lines at once."""
+        limitedStringIO = LimitedStringIO(10)
+        limitedStringIO.writelines(("foo", "bar"))
+        self.assertEqual(limitedStringIO.getvalue(), "foobar")
+
+        with self.assertRaises(MemoryOverflow) as cm:
+            limitedStringIO.writelines(("baz", "qux"))
+        self.assertEqual(cm.exception.used_memory, 12)
+        self.assertEqual(limitedStringIO.getvalue(), "foobar")
+
+    def test_cached_value(self):
+        """Make sure value is still correct after it was cached and the buffer was changed."""
+        limitedStringIO = LimitedStringIO(1_000)
+        limitedStringIO.write("foo")
+        self.assertEqual(limitedStringIO.getvalue(), "foo")
+        limitedStringIO.write("bar")
+        self.assertEqual(limitedStringIO.getvalue(), "foobar")
+        limitedStringIO.truncate(3)
+        self.assertEqual(limitedStringIO.getvalue(), "foo")
+
+    def test_truncate_frees_memory(self):
+        """Make sure truncated characters don't count towards the limit anymore."""
+        limitedStringIO = LimitedStringIO(5)
+        limitedStringIO.write("hello")
+        limitedStringIO.seek(0)
+        limitedStringIO.truncate(0)
+        limitedStringIO.write("there")
+        self.assertEqual(limitedStringIO.getvalue(), "there")
+
+    def test_overwrite(self):
+        """Make sure overwriting already written characters doesn't count towards the limit again."""
+        limitedStringIO = LimitedStringIO(5)
+        limitedStringIO.write("hello")
+        limitedStringIO.seek(0)
+        limitedStringIO.write("HE")
+        self.assertEqual(limitedStringIO.getvalue(), "HEllo")
+
+        with self.assertRaises(MemoryOverflow):
+            limitedStringIO.write("LLO!")
+
+    def test_reset(self):
+        """Make sure reset clears the buffer and frees all of the used memory."""
+        limitedStringIO = LimitedStringIO(5)
+        limitedStringIO.write("hello")
+        limitedStringIO.reset()
+        self.assertEqual(limitedStringIO.getvalue(), "")
+        limitedStringIO.write("there")
+        self.assertEqual(limitedStringIO.getvalue(), "there")
+
+    def test_newlines_kept(self):
+        """Make sure written newlines are stored without any translation."""
+        limitedStringIO = LimitedStringIO(1_000)
+        limitedStringIO.write("foo\r\nbar\rbaz\n")
+        self.assertEqual(limitedStringIO.getvalue(), "foo\r\nbar\rbaz\n")
 
 
 class IOCageTests(unittest.TestCase):
     """Tests for the STDOUT/STDERR capturing."""
 
+    def setUp(self):
+        self._original_std = (sys.stdout, sys.stderr, sys.stdin)
+
+    def tearDown(self):
+        """Make sure a test which failed during capturing doesn't leave the std streams overridden."""
+        sys.stdout, sys.stderr, sys.stdin = self._original_std
+
     # region: Implementation tests
     def test_manual_capture(self):
         """Test bare manual way of using IOCage"""
@@ -134,22 +196,19 @@ class IOCageTests(unittest.TestCase):
     def test_stdout(self):
         """Make sure IOCage is able to properly capture given prints."""
         test_cases = (
-            ("foo",),  # Single print
-            ("python", "is", "cool"),  # Multiple prints
-            (None, ),  # No print
+            (("foo",), "foo\n"),  # Single print
+            (("python", "is", "cool"), "python\nis\ncool\n"),  # Multiple prints
+            ((), ""),  # No print
         )
 
-        for test_prints in test_cases:
+        for test_prints, expected_stdout in test_cases:
             with self.subTest(test_prints=test_prints):
                 capture = IOCage()
 
                 with capture:
                     for test_print in test_prints:
-                        if test_print is not None:
-                            print(test_print)
+                        print(test_print)
 
-                expected_stdout = "\n".join(s for s in test_prints if s is not None)
-                expected_stdout = expected_stdout + "\n" if not expected_stdout == "" else expected_stdout
                 self.assertEqual(capture.stdout, expected_stdout)
 
     def test_stdin(self):
@@ -206,6 +265,30 @@ class IOCageTests(unittest.TestCase):
             print("print2")
         self.assertEqual(captured.stdout, "print2\n")
 
+    def test_reset_keeps_funnels(self):
+        """Make sure IOCage reset clears the existing funnels instead of replacing them."""
+        captured = IOCage(auto_reset=False)
+        stdout_funnel, stderr_funnel = captured.stdout_funnel, captured.stderr_funnel
+
+        with captured:
+            print("print1")
+        captured.reset()
+
+        self.assertIs(captured.stdout_funnel, stdout_funnel)
+        self.assertIs(captured.stderr_funnel, stderr_funnel)
+        self.assertEqual(captured.stdout, "")
+
+    def test_reset_during_capture(self):
+        """Make sure resetting IOCage while it's capturing keeps capturing into the same funnel."""
+        captured = IOCage(auto_reset=False)
+
+        with captured:
+            print("print1")
+            captured.reset()
+            print("print2")
+
+        self.assertEqual(captured.stdout, "print2\n")
+
     def test_stdout_disable(self):
         """Make sure IOCage doesn't capture stdout without `enable_stdout` set to `True`"""
         internal = IOCage(enable_stdout=False)
@@ -218,6 +301,39 @@ class IOCageTests(unittest.TestCase):
         self.assertEqual(internal.stdout, "")
         self.assertEqual(external.stdout, "(test)\n")
 
+    def test_nested_capture(self):
+        """Make sure nested IOCages capture their own output and restore the outer streams."""
+        _original_stdout = sys.stdout
+        internal = IOCage()
+        external = IOCage()
+
+        with external:
+            print("outer")
+            with internal:
+                print("inner")
+            self.assertIs(sys.stdout, external.stdout_funnel)
+            print("outer again")
+
+        self.assertIs(sys.stdout, _original_stdout)
+        self.assertEqual(internal.stdout, "inner\n")
+        self.assertEqual(external.stdout, "outer\nouter again\n")
+
+    def test_recursive_decorator(self):
+        """Make sure entering the same IOCage again (recursion) still restores the original streams."""
+        _original_stdout = sys.stdout
+        captured = IOCage(auto_reset=False)
+
+        @captured
+        def foo(depth):
+            print(depth)
+            if depth > 0:
+                foo(depth - 1)
+
+        foo(2)
+
+        self.assertIs(sys.stdout, _original_stdout)
+        self.assertEqual(captured.stdout, "2\n1\n0\n")
+
     def test_stderr_disable(self):
         """Make sure IOCage doesn't capture stderr without `enable_stdout` set to `True`"""
         internal = IOCage(enable_stderr=False)
@@ -0,0 +1,82 @@
+import os
+import sys
+import time
+import unittest
+
+from securepy import TimedFunction, TimedFunctionError
+
+
+def interrupt():
+    raise KeyboardInterrupt
+
+
+def exit_process():
+    sys.exit(1)
+
+
+def fail():
+    raise TypeError("example exception")
+
+
+def large_result():
+    return "x" * 1_000_000
+
+
+def exit_immediately():
+    os._exit(3)
+
+
+def sleep():
+    time.sleep(10)
+
+
+class TimedFunctionTests(unittest.TestCase):
+    """Tests for running functions with a time limit."""
+
+    # region: No time limit tests
+    def test_unlimited_return(self):
+        """Make sure functions without a time limit return their value."""
+        self.assertEqual(TimedFunction(None).run_timed(sum, args=((1, 2),)), 3)
+
+    def test_unlimited_exception(self):
+        """Make sure exceptions of functions without a time limit are wrapped in `TimedFunctionError`."""
+        with self.assertRaises(TimedFunctionError) as cm:
+            TimedFunction(None).run_timed(fail)
+
+        self.assertIsInstance(cm.exception.inner_exception, TypeError)
+
+    def test_unlimited_interrupt(self):
+        """Make sure interrupting or exiting the process from functions without a time limit isn't wrapped."""
+        test_cases = (
+            (interrupt, KeyboardInterrupt),
+            (exit_process, SystemExit),
+        )
+
+        for func, exc in test_cases:
+            with self.subTest(func=func.__name__):
+                with self.assertRaises(exc):
+                    TimedFunction(None).run_timed(func)
+
+    # endregion
+
+    # region: Time limit tests
+    def test_large_result(self):
+        """Make sure results which don't fit into the pipe buffer (64 KiB) are received."""
+        self.assertEqual(TimedFunction(10).run_timed(large_result), "x" * 1_000_000)
+
+    def test_process_exit(self):
+        """Make sure process ending without sending back the result raises `TimedFunctionError`."""
+        with self.assertRaises(TimedFunctionError) as cm:
+            TimedFunction(10).run_timed(exit_immediately)
+
+        self.assertIn("exit code 3", str(cm.exception))
+
+    def test_timeout(self):
+        """Make sure functions exceeding the time limit are stopped with `TimeoutError`."""
+        start = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            TimedFunction(0.5).run_timed(sleep)
+
+        self.assertLess(time.monotonic() - start, 5)
+
+    # endregion